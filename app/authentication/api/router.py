@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Header, status
+import hashlib
+from functools import wraps
+
+from fastapi import APIRouter, HTTPException, Header, Request, Response, status
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
 from pydantic import BaseModel, EmailStr
 
-from app.authentication.dependency_injection.container import auth_container
+from app.redis import redis_client
+from app.authentication.dependency_injection.container import auth_service
 from app.authentication.domain import (
     RegisterInput,
     LoginInput,
@@ -10,11 +16,50 @@ from app.authentication.domain import (
     SessionNotFoundError,
     InvalidSessionError
 )
+from app.files.api.router import auth_cache_key
+from app.files.router import invalidate_introspect_cache
 
 
 router = APIRouter()
 
 
+def introspect_cache_key(token: str) -> str:
+    """Cache key for a token's introspection result (token is hashed, never stored raw)"""
+    return f"introspect:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+def _introspect_key_builder(func, namespace="", *, request=None, response=None, args=(), kwargs=None):
+    return introspect_cache_key(kwargs["auth"])
+
+
+def _conditional_introspect(func):
+    """Attach a deterministic ETag and private Cache-Control to introspect responses
+
+    The ETag is stable across workers (unlike hash()-based ones), so clients
+    and proxies can revalidate with If-None-Match and get a bodyless 304.
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        request: Request = kwargs["request"]
+        response: Response = kwargs["response"]
+        result = await func(*args, **kwargs)
+
+        data = result if isinstance(result, dict) else result.model_dump()
+        etag = hashlib.blake2b(
+            f"{data['external_id']}:{data['username']}:{data['email']}".encode(),
+            digest_size=8,
+        ).hexdigest()
+
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "private, max-age=30"
+        return result
+
+    return wrapper
+
+
 class RegisterRequest(BaseModel):
     username: str
     email: EmailStr
@@ -52,7 +97,7 @@ async def register(request: RegisterRequest):
             password=request.password
         )
         
-        user = await auth_container.auth_service.register(input_data)
+        user = await auth_service.register(input_data)
         
         return StatusResponse(
             status="success",
@@ -80,14 +125,13 @@ async def login(request: LoginRequest):
             password=request.password
         )
         
-        session = await auth_container.auth_service.login(input_data)
-        
-        # Get user info for response
-        user = await auth_container.auth_service.introspect(session.token)
-        
-        return LoginResponse(
+        # login returns the user it already fetched; no extra introspect needed
+        session, user = await auth_service.login(input_data)
+
+        # Values come from trusted internal entities; skip re-validation
+        return LoginResponse.model_construct(
             token=session.token,
-            user=UserResponse(
+            user=UserResponse.model_construct(
                 external_id=user.external_id,
                 username=user.username,
                 email=user.email
@@ -110,8 +154,14 @@ async def login(request: LoginRequest):
 async def logout(auth: str = Header(alias="Auth")):
     """Logout user and invalidate session"""
     try:
-        await auth_container.auth_service.logout(auth)
-        
+        await auth_service.logout(auth)
+        await FastAPICache.clear(key=introspect_cache_key(auth))
+
+        # Drop the files router's {token -> external_id} memo so the token
+        # stops authenticating immediately instead of at TTL expiry
+        await redis_client.delete(auth_cache_key(auth))
+        invalidate_introspect_cache(auth)
+
         return StatusResponse(
             status="success",
             message="Logged out successfully"
@@ -130,12 +180,14 @@ async def logout(auth: str = Header(alias="Auth")):
 
 
 @router.get("/introspect", response_model=UserResponse)
-async def introspect(auth: str = Header(alias="Auth")):
+@_conditional_introspect
+@cache(expire=30, key_builder=_introspect_key_builder)
+async def introspect(request: Request, response: Response, auth: str = Header(alias="Auth")):
     """Get user information from session token"""
     try:
-        user = await auth_container.auth_service.introspect(auth)
-        
-        return UserResponse(
+        user = await auth_service.introspect(auth)
+
+        return UserResponse.model_construct(
             external_id=user.external_id,
             username=user.username,
             email=user.email
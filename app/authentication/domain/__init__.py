@@ -0,0 +1,24 @@
+from .entities import UserEntity, SessionEntity, RegisterInput, LoginInput
+from .exceptions import (
+    AuthenticationError,
+    UserAlreadyExistsError,
+    InvalidCredentialsError,
+    SessionNotFoundError,
+    InvalidSessionError,
+)
+from .service import AuthenticationService, IUserRepository, ISessionRepository
+
+__all__ = [
+    "UserEntity",
+    "SessionEntity",
+    "RegisterInput",
+    "LoginInput",
+    "AuthenticationError",
+    "UserAlreadyExistsError",
+    "InvalidCredentialsError",
+    "SessionNotFoundError",
+    "InvalidSessionError",
+    "AuthenticationService",
+    "IUserRepository",
+    "ISessionRepository",
+]
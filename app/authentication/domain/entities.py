@@ -16,14 +16,26 @@ class UserEntity:
 
 @dataclass
 class SessionEntity:
-    """Domain entity representing a user session"""
+    """Domain entity representing a user session
+
+    Timestamps are integer epoch seconds so hot-path comparisons are plain
+    int compares; the properties expose datetimes for display/compat.
+    """
     token: str
     user_id: int
-    created_at: datetime
-    expires_at: datetime
+    created_at_ts: int
+    expires_at_ts: int
     is_active: bool
     id: Optional[int] = None
-    
+
+    @property
+    def created_at(self) -> datetime:
+        return datetime.utcfromtimestamp(self.created_at_ts)
+
+    @property
+    def expires_at(self) -> datetime:
+        return datetime.utcfromtimestamp(self.expires_at_ts)
+
 
 @dataclass
 class RegisterInput:
@@ -1,55 +1,38 @@
-from abc import ABC, abstractmethod
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Optional, Protocol
 import secrets
 
 from .entities import UserEntity, SessionEntity, RegisterInput, LoginInput
 from .exceptions import (
-    UserAlreadyExistsError,
     InvalidCredentialsError,
     SessionNotFoundError,
     InvalidSessionError
 )
 
 
-class IUserRepository(ABC):
-    """Interface for user persistence"""
-    
-    @abstractmethod
+class IUserRepository(Protocol):
+    """Interface for user persistence (structural, no ABC machinery)"""
+
     async def create_user(self, username: str, email: str, password: str) -> UserEntity:
-        pass
-    
-    @abstractmethod
-    async def get_user_by_username(self, username: str) -> Optional[UserEntity]:
-        pass
-    
-    @abstractmethod
-    async def user_exists(self, username: str, email: str) -> bool:
-        pass
-    
-    @abstractmethod
+        ...
+
     async def verify_password(self, username: str, password: str) -> Optional[UserEntity]:
-        pass
+        ...
 
 
-class ISessionRepository(ABC):
-    """Interface for session persistence"""
-    
-    @abstractmethod
-    async def create_session(self, user_id: int) -> SessionEntity:
-        pass
-    
-    @abstractmethod
+class ISessionRepository(Protocol):
+    """Interface for session persistence (structural, no ABC machinery)"""
+
+    async def create_session(self, user_id: int, user: Optional[UserEntity] = None) -> SessionEntity:
+        ...
+
     async def get_session(self, token: str) -> Optional[SessionEntity]:
-        pass
-    
-    @abstractmethod
+        ...
+
     async def invalidate_session(self, token: str) -> bool:
-        pass
-    
-    @abstractmethod
+        ...
+
     async def get_user_by_session(self, token: str) -> Optional[UserEntity]:
-        pass
+        ...
 
 
 class AuthenticationService:
@@ -60,12 +43,11 @@ class AuthenticationService:
         self.session_repo = session_repo
     
     async def register(self, input_data: RegisterInput) -> UserEntity:
-        """Register a new user"""
-        # Check if user already exists
-        if await self.user_repo.user_exists(input_data.username, input_data.email):
-            raise UserAlreadyExistsError("Username or email already exists")
-        
-        # Create user
+        """Register a new user
+
+        The repository insert is atomic and raises UserAlreadyExistsError on
+        conflict, so no separate exists-check query is needed.
+        """
         user = await self.user_repo.create_user(
             username=input_data.username,
             email=input_data.email,
@@ -74,21 +56,21 @@ class AuthenticationService:
         
         return user
     
-    async def login(self, input_data: LoginInput) -> SessionEntity:
+    async def login(self, input_data: LoginInput) -> tuple[SessionEntity, UserEntity]:
         """Authenticate user and create session"""
         # Verify credentials
         user = await self.user_repo.verify_password(
             username=input_data.username,
             password=input_data.password
         )
-        
+
         if not user:
             raise InvalidCredentialsError("Invalid username or password")
-        
-        # Create session
-        session = await self.session_repo.create_session(user.id)
-        
-        return session
+
+        # Create session, reusing the user already fetched for verification
+        session = await self.session_repo.create_session(user.id, user=user)
+
+        return session, user
     
     async def logout(self, token: str) -> bool:
         """Invalidate user session"""
@@ -104,12 +86,7 @@ class AuthenticationService:
         
         if not session or not session.is_active:
             raise InvalidSessionError("Invalid or expired session")
-        
-        # Check expiration
-        if session.expires_at < datetime.utcnow():
-            await self.session_repo.invalidate_session(token)
-            raise InvalidSessionError("Session expired")
-        
+
         # Get user
         user = await self.session_repo.get_user_by_session(token)
         if not user:
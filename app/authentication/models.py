@@ -1,15 +1,21 @@
 from tortoise.models import Model
 from tortoise import fields
+from passlib.hash import bcrypt
 import hashlib
+import os
 import secrets
 
+# Server-side pepper for password hashing; BLAKE2's built-in keying gives a
+# keyed hash in a single call (no HMAC construction needed)
+_PASSWORD_PEPPER = os.getenv("PASSWORD_PEPPER", "").encode()
+
 
 class User(Model):
     id = fields.IntField(pk=True)
-    external_id = fields.IntField(unique=True)
+    external_id = fields.BigIntField(unique=True)
     username = fields.CharField(max_length=50, unique=True)
     email = fields.CharField(max_length=100, unique=True)
-    password_hash = fields.CharField(max_length=128)
+    password_hash = fields.CharField(max_length=256)
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
     
@@ -18,34 +24,28 @@ class User(Model):
     
     class Meta:
         table = "users"
-    
+
+    @staticmethod
+    def _prehash(password: str) -> str:
+        """Keyed BLAKE2 pre-hash: peppers the password and keeps the bcrypt
+        input fixed-length (bcrypt truncates beyond 72 bytes)"""
+        return hashlib.blake2b(
+            password.encode(), key=_PASSWORD_PEPPER, digest_size=32
+        ).hexdigest()
+
     @classmethod
-    async def create_with_external_id(cls, username: str, email: str, password: str):
-        """Create a user with auto-generated unique external_id"""
-        # Generate unique external_id
-        while True:
-            external_id = secrets.randbelow(1000000000) + 1  # Generate 1 to 1 billion
-            if not await cls.filter(external_id=external_id).exists():
-                break
-        
-        # Hash password
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        
-        return await cls.create(
-            external_id=external_id,
-            username=username,
-            email=email,
-            password_hash=password_hash
-        )
-    
+    def hash_password(cls, password: str) -> str:
+        """Hash a password with bcrypt (salted)"""
+        return bcrypt.hash(cls._prehash(password))
+
     def verify_password(self, password: str) -> bool:
-        """Verify password against stored hash"""
-        return hashlib.sha256(password.encode()).hexdigest() == self.password_hash
+        """Verify password against stored hash (constant-time)"""
+        return bcrypt.verify(self._prehash(password), self.password_hash)
 
 
 class Session(Model):
     id = fields.IntField(pk=True)
-    token = fields.CharField(max_length=64, unique=True)
+    token = fields.CharField(max_length=32, unique=True)
     user = fields.ForeignKeyField("authentication.User", related_name="sessions")
     created_at = fields.DatetimeField(auto_now_add=True)
     expires_at = fields.DatetimeField()
@@ -59,7 +59,7 @@ class Session(Model):
         """Create a new session token for user"""
         from datetime import datetime, timedelta
         
-        token = secrets.token_hex(32)
+        token = secrets.token_urlsafe(24)  # 192 bits in 32 chars
         expires_at = datetime.utcnow() + timedelta(hours=24)
         
         return await cls.create(
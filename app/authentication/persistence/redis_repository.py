@@ -1,120 +1,122 @@
-import json
-import os
+import orjson
+import time
 from typing import Optional
 from datetime import datetime
-import redis.asyncio as redis
 
+from app.redis import redis_client
 from app.authentication.domain.entities import UserEntity, SessionEntity
-from app.authentication.domain.service import ISessionRepository
 from app.authentication.models import User
 
 
-class RedisSessionRepository(ISessionRepository):
+class RedisSessionRepository:
     """Redis implementation of session repository"""
-    
-    def __init__(self):
-        self._redis_client = None
-        self._redis_host = os.getenv("REDIS_HOST", "localhost")
-        self._redis_port = int(os.getenv("REDIS_PORT", 6379))
-    
-    async def _get_redis(self):
-        """Get Redis client (lazy initialization)"""
-        if self._redis_client is None:
-            self._redis_client = redis.Redis(
-                host=self._redis_host,
-                port=self._redis_port,
-                decode_responses=True
-            )
-        return self._redis_client
-    
-    async def create_session(self, user_id: int) -> SessionEntity:
+
+    def __init__(self, client=redis_client):
+        self._redis = client
+
+    async def create_session(self, user_id: int, user: Optional[UserEntity] = None) -> SessionEntity:
         """Create a new session for user"""
         import secrets
-        from datetime import datetime, timedelta
-        
-        token = secrets.token_hex(32)
-        expires_at = datetime.utcnow() + timedelta(hours=24)
-        
-        # Get user to store in session
-        user = await User.filter(id=user_id).first()
-        if not user:
-            raise ValueError(f"User {user_id} not found")
-        
+
+        token = secrets.token_urlsafe(24)  # 192 bits in 32 chars
+        now_ts = int(time.time())
+
+        # Only hit the database when the caller didn't already fetch the user
+        if user is None:
+            db_user = await User.filter(id=user_id).only(
+                "id", "external_id", "username", "email", "created_at", "updated_at"
+            ).first()
+            if not db_user:
+                raise ValueError(f"User {user_id} not found")
+            user = UserEntity(
+                id=db_user.id,
+                external_id=db_user.external_id,
+                username=db_user.username,
+                email=db_user.email,
+                created_at=db_user.created_at,
+                updated_at=db_user.updated_at
+            )
+
         session = SessionEntity(
             token=token,
             user_id=user_id,
-            created_at=datetime.utcnow(),
-            expires_at=expires_at,
+            created_at_ts=now_ts,
+            expires_at_ts=now_ts + 24 * 3600,
             is_active=True
         )
         
-        # Store session in Redis with expiration
-        redis_client = await self._get_redis()
+        # Store session in Redis with expiration; the user fields are cached
+        # in the payload so introspection never has to hit Postgres
         session_data = {
             "user_id": user_id,
             "user_external_id": user.external_id,
             "username": user.username,
             "email": user.email,
-            "created_at": session.created_at.isoformat(),
-            "expires_at": session.expires_at.isoformat(),
-            "is_active": True
+            "user_created_at": int(user.created_at.timestamp()),
+            "user_updated_at": int(user.updated_at.timestamp()),
+            "created_at": session.created_at_ts,
+            "expires_at": session.expires_at_ts
         }
         
-        # Set expiration to 24 hours
-        await redis_client.setex(
+        await self._redis.setex(
             f"session:{token}",
             24 * 3600,  # 24 hours in seconds
-            json.dumps(session_data)
+            orjson.dumps(session_data)
         )
-        
+
         return session
     
     async def get_session(self, token: str) -> Optional[SessionEntity]:
         """Get session by token"""
-        redis_client = await self._get_redis()
-        session_data = await redis_client.get(f"session:{token}")
+        session_data = await self._redis.get(f"session:{token}")
         
         if not session_data:
             return None
         
-        data = json.loads(session_data)
+        data = orjson.loads(session_data)
         
         return SessionEntity(
             token=token,
             user_id=data["user_id"],
-            created_at=datetime.fromisoformat(data["created_at"]),
-            expires_at=datetime.fromisoformat(data["expires_at"]),
-            is_active=data["is_active"]
+            created_at_ts=data["created_at"],
+            expires_at_ts=data["expires_at"],
+            # Key presence == active: the TTL removes expired sessions
+            is_active=True
         )
     
     async def invalidate_session(self, token: str) -> bool:
         """Invalidate a session"""
-        redis_client = await self._get_redis()
-        
-        # Check if session exists
-        session_data = await redis_client.get(f"session:{token}")
-        if not session_data:
-            return False
-        
-        # Delete session from Redis
-        await redis_client.delete(f"session:{token}")
-        return True
+        # DEL returns the number of removed keys, so no existence GET is needed
+        deleted = await self._redis.delete(f"session:{token}")
+        return deleted > 0
     
     async def get_user_by_session(self, token: str) -> Optional[UserEntity]:
         """Get user associated with session"""
-        redis_client = await self._get_redis()
-        session_data = await redis_client.get(f"session:{token}")
+        session_data = await self._redis.get(f"session:{token}")
         
         if not session_data:
             return None
         
-        data = json.loads(session_data)
-        
-        # Get fresh user data from database
-        user = await User.filter(id=data["user_id"]).first()
+        data = orjson.loads(session_data)
+
+        # The session payload already carries the user fields; only fall back
+        # to the database for sessions written before they were cached
+        if "user_created_at" in data:
+            return UserEntity(
+                id=data["user_id"],
+                external_id=data["user_external_id"],
+                username=data["username"],
+                email=data["email"],
+                created_at=datetime.utcfromtimestamp(data["user_created_at"]),
+                updated_at=datetime.utcfromtimestamp(data["user_updated_at"])
+            )
+
+        user = await User.filter(id=data["user_id"]).only(
+            "id", "external_id", "username", "email", "created_at", "updated_at"
+        ).first()
         if not user:
             return None
-        
+
         return UserEntity(
             id=user.id,
             external_id=user.external_id,
@@ -1,54 +1,51 @@
+import secrets
 from typing import Optional
-from datetime import datetime
+
+from tortoise import connections
 
 from app.authentication.models import User, Session
 from app.authentication.domain.entities import UserEntity, SessionEntity
-from app.authentication.domain.service import IUserRepository, ISessionRepository
+from app.authentication.domain.exceptions import UserAlreadyExistsError
 
 
-class UserRepository(IUserRepository):
+class UserRepository:
     """Tortoise ORM implementation of user repository"""
-    
+
     async def create_user(self, username: str, email: str, password: str) -> UserEntity:
-        """Create a new user"""
-        user = await User.create_with_external_id(
-            username=username,
-            email=email,
-            password=password
-        )
-        
-        return UserEntity(
-            id=user.id,
-            external_id=user.external_id,
-            username=user.username,
-            email=user.email,
-            created_at=user.created_at,
-            updated_at=user.updated_at
+        """Create a new user in a single round-trip
+
+        ON CONFLICT DO NOTHING folds the exists-check into the INSERT itself;
+        an empty RETURNING means the username or email was already taken.
+        """
+        password_hash = User.hash_password(password)
+        conn = connections.get("default")
+        rows = await conn.execute_query_dict(
+            "INSERT INTO users (external_id, username, email, password_hash, created_at, updated_at) "
+            "VALUES ($1, $2, $3, $4, NOW(), NOW()) "
+            "ON CONFLICT DO NOTHING "
+            "RETURNING id, external_id, created_at, updated_at",
+            [secrets.randbits(63), username, email, password_hash],
         )
-    
-    async def get_user_by_username(self, username: str) -> Optional[UserEntity]:
-        """Get user by username"""
-        user = await User.filter(username=username).first()
-        if not user:
-            return None
-        
+
+        if not rows:
+            raise UserAlreadyExistsError("Username or email already exists")
+
+        row = rows[0]
         return UserEntity(
-            id=user.id,
-            external_id=user.external_id,
-            username=user.username,
-            email=user.email,
-            created_at=user.created_at,
-            updated_at=user.updated_at
+            id=row["id"],
+            external_id=row["external_id"],
+            username=username,
+            email=email,
+            created_at=row["created_at"],
+            updated_at=row["updated_at"]
         )
     
-    async def user_exists(self, username: str, email: str) -> bool:
-        """Check if user exists by username or email"""
-        return await User.filter(username=username).exists() or \
-               await User.filter(email=email).exists()
-    
     async def verify_password(self, username: str, password: str) -> Optional[UserEntity]:
         """Verify user password and return user if valid"""
-        user = await User.filter(username=username).first()
+        user = await User.filter(username=username).only(
+            "id", "external_id", "username", "email", "password_hash",
+            "created_at", "updated_at"
+        ).first()
         if not user or not user.verify_password(password):
             return None
         
@@ -62,10 +59,10 @@ class UserRepository(IUserRepository):
         )
 
 
-class SessionRepository(ISessionRepository):
+class SessionRepository:
     """Tortoise ORM implementation of session repository"""
     
-    async def create_session(self, user_id: int) -> SessionEntity:
+    async def create_session(self, user_id: int, user: Optional[UserEntity] = None) -> SessionEntity:
         """Create a new session for user"""
         session = await Session.create_for_user(user_id)
         
@@ -73,8 +70,8 @@ class SessionRepository(ISessionRepository):
             id=session.id,
             token=session.token,
             user_id=session.user_id,
-            created_at=session.created_at,
-            expires_at=session.expires_at,
+            created_at_ts=int(session.created_at.timestamp()),
+            expires_at_ts=int(session.expires_at.timestamp()),
             is_active=session.is_active
         )
     
@@ -88,8 +85,8 @@ class SessionRepository(ISessionRepository):
             id=session.id,
             token=session.token,
             user_id=session.user_id,
-            created_at=session.created_at,
-            expires_at=session.expires_at,
+            created_at_ts=int(session.created_at.timestamp()),
+            expires_at_ts=int(session.expires_at.timestamp()),
             is_active=session.is_active
         )
     
@@ -105,11 +102,12 @@ class SessionRepository(ISessionRepository):
     
     async def get_user_by_session(self, token: str) -> Optional[UserEntity]:
         """Get user associated with session"""
-        session = await Session.filter(token=token, is_active=True).first()
+        # select_related joins the user in, avoiding a lazy second query
+        session = await Session.filter(token=token, is_active=True).select_related("user").first()
         if not session:
             return None
-        
-        user = await session.user
+
+        user = session.user
         if not user:
             return None
         
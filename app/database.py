@@ -11,6 +11,12 @@ TORTOISE_ORM = {
                 "user": os.getenv("DB_USER", "postgres"),
                 "password": os.getenv("DB_PASSWORD", "postgres"),
                 "database": os.getenv("DB_NAME", "carlemany_files"),
+                # asyncpg pool sizing: without this every request serializes
+                # on a single connection
+                "minsize": int(os.getenv("DB_POOL_MIN", 10)),
+                "maxsize": int(os.getenv("DB_POOL_MAX", 50)),
+                "max_queries": 50000,
+                "max_inactive_connection_lifetime": 300,
             }
         }
     },
@@ -0,0 +1,12 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# CPU-bound work (PDF merging) is dispatched here so concurrent merges
+# parallelize across cores instead of taking turns on the event loop's
+# thread. Lives in its own module so routers can import it without a
+# circular import through app.main.
+merge_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+def shutdown_executors() -> None:
+    merge_pool.shutdown(wait=False, cancel_futures=True)
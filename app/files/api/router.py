@@ -1,22 +1,22 @@
+import hashlib
+
 from fastapi import APIRouter, HTTPException, Header, UploadFile, File, status
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 
-from app.files.dependency_injection.container import file_container
-from app.authentication.dependency_injection.container import auth_container
-from app.files.domain import (
-    CreateFileInput,
-    MergeFilesInput,
-    FileNotFoundError,
-    FileNotUploadedError,
-    UnauthorizedFileAccessError,
-    FileMergeError
-)
+from app.redis import redis_client
+from app.files.dependency_injection.container import file_service
+from app.authentication.dependency_injection.container import auth_service
+from app.files.domain import CreateFileInput, MergeFilesInput
 from app.authentication.domain import InvalidSessionError
 
 
-router = APIRouter()
+# orjson encodes response payloads several times faster than stdlib json,
+# which matters most for list-heavy responses like GET /
+# Domain exceptions are translated to HTTP responses by the app-level
+# handlers registered in app.main, so the endpoints carry no try/except.
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 class FileInfoRequest(BaseModel):
@@ -33,6 +33,35 @@ class FileResponse(BaseModel):
     description: Optional[str] = None
 
 
+class FilesListResponse(BaseModel):
+    status: str
+    files: List[FileResponse]
+
+
+class FileDetailResponse(BaseModel):
+    status: str
+    file_id: str
+    file_name: str
+    pages: int
+    uploaded: bool
+    description: Optional[str] = None
+    download_available: bool = False
+
+
+class StatusResponse(BaseModel):
+    status: str
+
+
+class DeleteFileResponse(BaseModel):
+    status: str
+    file_id: str
+    message: str
+
+
+class DownloadUrlResponse(BaseModel):
+    url: str
+
+
 class CreateFileResponse(BaseModel):
     file_id: str
 
@@ -47,227 +76,182 @@ class MergeResponse(BaseModel):
     merged_file_id: str
 
 
+# TTLs for the {token -> external_id} auth cache: valid tokens are memoized
+# briefly, invalid ones are negatively cached to blunt brute-force attempts
+AUTH_CACHE_TTL = 900
+AUTH_NEGATIVE_CACHE_TTL = 30
+_AUTH_INVALID = b"-1"
+
+
+def auth_cache_key(auth_token: str) -> str:
+    """Cache key for a token's resolved external_id (token is hashed, never stored raw)"""
+    return f"v1:auth:{hashlib.sha256(auth_token.encode()).hexdigest()}"
+
+
 async def get_user_external_id(auth_token: str) -> int:
-    """Get user external ID from auth token"""
+    """Get user external ID from auth token, memoized in Redis"""
+    key = auth_cache_key(auth_token)
+    cached = await redis_client.get(key)
+    if cached is not None:
+        if cached == _AUTH_INVALID:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired session"
+            )
+        return int(cached)
+
     try:
-        user = await auth_container.auth_service.introspect(auth_token)
-        return user.external_id
+        user = await auth_service.introspect(auth_token)
     except InvalidSessionError:
+        await redis_client.set(key, _AUTH_INVALID, ex=AUTH_NEGATIVE_CACHE_TTL)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired session"
         )
 
+    await redis_client.set(key, user.external_id, ex=AUTH_CACHE_TTL)
+    return user.external_id
+
 
-@router.get("", response_model=dict)
+@router.get("", response_model=FilesListResponse)
 async def get_files(auth: str = Header(alias="Auth")):
     """Get all files owned by the authenticated user"""
-    try:
-        user_external_id = await get_user_external_id(auth)
-        files = await file_container.file_service.get_user_files(user_external_id)
-        
-        return {
-            "status": "ok",
-            "files": [
-                {
-                    "file_id": f.file_id,
-                    "name": f.name,
-                    "pages": f.amount_of_pages,
-                    "uploaded": f.is_uploaded,
-                    "description": f.description
-                }
-                for f in files
-            ]
-        }
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        )
+    user_external_id = await get_user_external_id(auth)
+    files = await file_service.get_user_files(user_external_id)
+
+    # Values come from trusted internal entities; skip re-validation
+    return FilesListResponse.model_construct(
+        status="ok",
+        files=[
+            FileResponse.model_construct(
+                file_id=f.file_id,
+                name=f.name,
+                pages=f.amount_of_pages,
+                uploaded=f.is_uploaded,
+                description=f.description
+            )
+            for f in files
+        ]
+    )
 
 
 @router.post("", response_model=CreateFileResponse, status_code=status.HTTP_201_CREATED)
 async def create_file(file_info: FileInfoRequest, auth: str = Header(alias="Auth")):
     """Create a new file entry"""
-    try:
-        user_external_id = await get_user_external_id(auth)
-        
-        input_data = CreateFileInput(
-            name=file_info.name,
-            amount_of_pages=file_info.amount_of_pages,
-            description=file_info.description
-        )
-        
-        file_entity = await file_container.file_service.create_file(input_data, user_external_id)
-        
-        return CreateFileResponse(file_id=file_entity.file_id)
-    
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        )
+    user_external_id = await get_user_external_id(auth)
+
+    input_data = CreateFileInput(
+        name=file_info.name,
+        amount_of_pages=file_info.amount_of_pages,
+        description=file_info.description
+    )
 
+    file_entity = await file_service.create_file(input_data, user_external_id)
 
-@router.get("/{file_id}", response_model=dict)
+    return CreateFileResponse(file_id=file_entity.file_id)
+
+
+@router.get("/{file_id}", response_model=FileDetailResponse)
 async def get_file(file_id: str, auth: str = Header(alias="Auth")):
     """Get file information and content if available"""
-    try:
-        user_external_id = await get_user_external_id(auth)
-        file_entity = await file_container.file_service.get_file(file_id, user_external_id)
-        
-        response = {
-            "status": "ok",
-            "file_id": file_entity.file_id,
-            "file_name": file_entity.name,
-            "pages": file_entity.amount_of_pages,
-            "uploaded": file_entity.is_uploaded,
-            "description": file_entity.description
-        }
-        
-        # If file is uploaded and user wants to download, return file
-        if file_entity.is_uploaded and file_entity.file_path:
-            # You could add a query parameter to trigger download
-            # For now, just include info that file is available
-            response["download_available"] = True
-        
-        return response
-    
-    except FileNotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-    except UnauthorizedFileAccessError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=str(e)
-        )
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        )
+    user_external_id = await get_user_external_id(auth)
+    file_entity = await file_service.get_file(file_id, user_external_id)
+
+    return FileDetailResponse.model_construct(
+        status="ok",
+        file_id=file_entity.file_id,
+        file_name=file_entity.name,
+        pages=file_entity.amount_of_pages,
+        uploaded=file_entity.is_uploaded,
+        description=file_entity.description,
+        download_available=bool(file_entity.is_uploaded and file_entity.file_path)
+    )
+
+
+# Presigned URLs live for 5 minutes; the cached copy expires 30s earlier
+# so a client never receives an already-dead URL
+DOWNLOAD_URL_TTL = 300
+
 
+@router.get("/{file_id}/download", response_model=DownloadUrlResponse)
+async def get_download_url(file_id: str, auth: str = Header(alias="Auth")):
+    """Get a presigned URL for downloading the file directly from storage"""
+    user_external_id = await get_user_external_id(auth)
 
-@router.post("/{file_id}", response_model=dict)
+    # Ownership is checked on every call; only the URL generation is cached
+    cache_key = f"v1:dl:{file_id}"
+    cached = await redis_client.get(cache_key)
+    if cached is not None:
+        await file_service.get_file(file_id, user_external_id)
+        return DownloadUrlResponse.model_construct(url=cached.decode())
+
+    url = await file_service.get_download_url(
+        file_id, user_external_id, expires_in=DOWNLOAD_URL_TTL
+    )
+    await redis_client.set(cache_key, url, ex=DOWNLOAD_URL_TTL - 30)
+
+    return DownloadUrlResponse.model_construct(url=url)
+
+
+@router.post("/{file_id}", response_model=StatusResponse)
 async def upload_file_content(
-    file_id: str, 
-    file_content: UploadFile = File(), 
+    file_id: str,
+    file_content: UploadFile = File(),
     auth: str = Header(alias="Auth")
 ):
     """Upload file content"""
-    try:
-        user_external_id = await get_user_external_id(auth)
-        
-        # Read file content
-        content = await file_content.read()
-        
-        await file_container.file_service.upload_file_content(
-            file_id=file_id,
-            owner_external_id=user_external_id,
-            file_content=content,
-            content_type=file_content.content_type
-        )
-        
-        return {"status": "ok"}
-    
-    except FileNotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-    except UnauthorizedFileAccessError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=str(e)
-        )
-    except ValueError as e:
+    user_external_id = await get_user_external_id(auth)
+
+    # Reject before touching the body so a bad upload costs nothing
+    if file_content.content_type != "application/pdf":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+            detail=f"Invalid file type: {file_content.content_type}. Only PDFs are allowed."
         )
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
+
+    # Peek the magic bytes; a spoofed content-type header is cheap
+    header = await file_content.read(4)
+    if header != b"%PDF":
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File content is not a valid PDF"
         )
+    await file_content.seek(0)
+
+    # Hand the underlying SpooledTemporaryFile to the service so the
+    # upload streams to S3 instead of buffering the whole body in memory
+    await file_service.upload_file_content(
+        file_id=file_id,
+        owner_external_id=user_external_id,
+        file_stream=file_content.file
+    )
+
+    return StatusResponse.model_construct(status="ok")
 
 
-@router.delete("/{file_id}", response_model=dict)
+@router.delete("/{file_id}", response_model=DeleteFileResponse)
 async def delete_file(file_id: str, auth: str = Header(alias="Auth")):
     """Delete a file"""
-    try:
-        user_external_id = await get_user_external_id(auth)
-        await file_container.file_service.delete_file(file_id, user_external_id)
-        
-        return {
-            "status": "ok",
-            "file_id": file_id,
-            "message": "File deleted successfully"
-        }
-    
-    except FileNotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        )
-    except UnauthorizedFileAccessError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=str(e)
-        )
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        )
+    user_external_id = await get_user_external_id(auth)
+    await file_service.delete_file(file_id, user_external_id)
+
+    return DeleteFileResponse.model_construct(
+        status="ok",
+        file_id=file_id,
+        message="File deleted successfully"
+    )
 
 
 @router.post("/merge", response_model=MergeResponse)
 async def merge_files(merge_request: MergeRequest, auth: str = Header(alias="Auth")):
     """Merge multiple PDF files"""
-    try:
-        user_external_id = await get_user_external_id(auth)
-        
-        input_data = MergeFilesInput(file_ids=merge_request.file_ids)
-        merged_file = await file_container.file_service.merge_files(input_data, user_external_id)
-        
-        return MergeResponse(
-            status="ok",
-            message="Files merged successfully",
-            merged_file_id=merged_file.file_id
-        )
-    
-    except (FileNotFoundError, FileNotUploadedError, UnauthorizedFileAccessError) as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND if isinstance(e, FileNotFoundError) else status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except FileMergeError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        )
\ No newline at end of file
+    user_external_id = await get_user_external_id(auth)
+
+    input_data = MergeFilesInput(file_ids=merge_request.file_ids)
+    merged_file = await file_service.merge_files(input_data, user_external_id)
+
+    return MergeResponse(
+        status="ok",
+        message="Files merged successfully",
+        merged_file_id=merged_file.file_id
+    )
@@ -0,0 +1,26 @@
+from .entities import FileEntity, CreateFileInput, MergeFilesInput
+from .exceptions import (
+    FileError,
+    FileNotFoundError,
+    InvalidFileInputError,
+    FileNotUploadedError,
+    UnauthorizedFileAccessError,
+    FileMergeError,
+)
+from .service import FileService, IFileRepository
+from .storage_service import IFileStorageService
+
+__all__ = [
+    "FileEntity",
+    "CreateFileInput",
+    "MergeFilesInput",
+    "FileError",
+    "FileNotFoundError",
+    "InvalidFileInputError",
+    "FileNotUploadedError",
+    "UnauthorizedFileAccessError",
+    "FileMergeError",
+    "FileService",
+    "IFileRepository",
+    "IFileStorageService",
+]
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional, List
 
 
-@dataclass
+@dataclass(slots=True)
 class FileEntity:
     """Domain entity representing a file"""
     file_id: str
@@ -17,8 +17,24 @@ class FileEntity:
     is_uploaded: bool = False
     id: Optional[int] = None
 
+    @classmethod
+    def from_values_row(cls, row: dict) -> "FileEntity":
+        """Build an entity from a .values(...) row without hydrating an ORM object"""
+        return cls(
+            id=row["id"],
+            file_id=row["file_id"],
+            name=row["name"],
+            amount_of_pages=row["amount_of_pages"],
+            description=row["description"],
+            file_path=row["file_path"],
+            is_uploaded=row["is_uploaded"],
+            owner_external_id=row["owner__external_id"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
 
-@dataclass
+
+@dataclass(slots=True)
 class CreateFileInput:
     """Input for creating a new file"""
     name: str
@@ -26,7 +42,7 @@ class CreateFileInput:
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MergeFilesInput:
     """Input for merging multiple files"""
-    file_ids: List[str]
\ No newline at end of file
+    file_ids: List[str]
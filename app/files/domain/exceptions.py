@@ -8,6 +8,11 @@ class FileNotFoundError(FileError):
     pass
 
 
+class InvalidFileInputError(FileError):
+    """Raised when a request's file input is invalid (maps to a 400)"""
+    pass
+
+
 class FileNotUploadedError(FileError):
     """Raised when trying to access file content that hasn't been uploaded"""
     pass
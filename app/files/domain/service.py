@@ -1,13 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
-import uuid
+from typing import BinaryIO, Optional, List
+import asyncio
 import os
-from pypdf import PdfMerger
-import io
+import tempfile
+import uuid
+from pypdf import PdfWriter
 
 from .entities import FileEntity, CreateFileInput, MergeFilesInput
 from .exceptions import (
     FileNotFoundError,
+    InvalidFileInputError,
     FileNotUploadedError,
     UnauthorizedFileAccessError,
     FileMergeError
@@ -15,6 +17,18 @@ from .exceptions import (
 from .storage_service import IFileStorageService
 
 
+def _merge_pdfs_sync(input_paths: List[str], output_path: str) -> None:
+    """Merge the given PDFs into output_path (CPU-bound, run off the event loop)"""
+    writer = PdfWriter()
+    try:
+        for path in input_paths:
+            writer.append(path)
+        with open(output_path, "wb") as out:
+            writer.write(out)
+    finally:
+        writer.close()
+
+
 class IFileRepository(ABC):
     """Interface for file persistence"""
     
@@ -29,6 +43,10 @@ class IFileRepository(ABC):
     @abstractmethod
     async def get_files_by_owner(self, owner_external_id: int) -> List[FileEntity]:
         pass
+
+    @abstractmethod
+    async def get_files_by_ids(self, file_ids: List[str], owner_external_id: int) -> List[FileEntity]:
+        pass
     
     @abstractmethod
     async def update_file_path(self, file_id: str, file_path: str) -> bool:
@@ -45,10 +63,19 @@ class FileService:
     def __init__(self, file_repo: IFileRepository, storage_service: IFileStorageService):
         self.file_repo = file_repo
         self.storage_service = storage_service
+        # Bounds sockets/descriptors/disk used by one merge no matter how
+        # many file_ids a request lists; sized to the S3 connection pool
+        self._download_sem = asyncio.Semaphore(int(os.getenv("MERGE_MAX_PARALLEL", "16")))
+
+    async def _download_limited(self, file_id: str, path: str) -> None:
+        async with self._download_sem:
+            await self.storage_service.download_to_file(file_id, path)
     
     async def create_file(self, input_data: CreateFileInput, owner_external_id: int) -> FileEntity:
         """Create a new file entry"""
-        file_id = str(uuid.uuid4())
+        # .hex skips the Python-level dash formatting of str(uuid4()) and
+        # gives shorter ids (32 chars), which also keeps index entries smaller
+        file_id = uuid.uuid4().hex
         
         file_data = {
             "file_id": file_id,
@@ -76,18 +103,18 @@ class FileService:
         """Get all files owned by user"""
         return await self.file_repo.get_files_by_owner(owner_external_id)
     
-    async def upload_file_content(self, file_id: str, owner_external_id: int, 
-                                 file_content: bytes, content_type: str) -> FileEntity:
-        """Upload file content"""
+    async def upload_file_content(self, file_id: str, owner_external_id: int,
+                                 file_stream: BinaryIO) -> FileEntity:
+        """Upload file content from a stream without buffering it in memory
+
+        Content validation (type header, PDF magic bytes) happens at the
+        router edge, before any of the body is drained.
+        """
         # Check file exists and user owns it
         file_entity = await self.get_file(file_id, owner_external_id)
-        
-        # Validate content type
-        if content_type != "application/pdf":
-            raise ValueError(f"Invalid file type: {content_type}. Only PDFs are allowed.")
-        
-        # Upload to S3
-        storage_path = await self.storage_service.upload_file(file_id, file_content)
+
+        # Multipart-upload to S3 straight from the stream
+        storage_path = await self.storage_service.upload_fileobj(file_id, file_stream)
         
         # Update file path in database
         await self.file_repo.update_file_path(file_id, storage_path)
@@ -96,6 +123,20 @@ class FileService:
         
         return file_entity
     
+    async def get_download_url(self, file_id: str, owner_external_id: int,
+                               expires_in: int = 300) -> str:
+        """Get a presigned download URL with ownership check
+
+        The client fetches straight from S3, so the API never proxies the
+        file's bytes.
+        """
+        file_entity = await self.get_file(file_id, owner_external_id)
+
+        if not file_entity.is_uploaded:
+            raise FileNotUploadedError(f"File {file_id} has not been uploaded yet")
+
+        return await self.storage_service.get_presigned_url(file_id, expires_in)
+
     async def delete_file(self, file_id: str, owner_external_id: int) -> bool:
         """Delete file with ownership check"""
         # Check file exists and user owns it
@@ -111,24 +152,29 @@ class FileService:
     async def merge_files(self, input_data: MergeFilesInput, owner_external_id: int) -> FileEntity:
         """Merge multiple PDF files"""
         if len(input_data.file_ids) < 2:
-            raise ValueError("At least 2 files are required for merging")
-        
-        # Check all files exist, are owned by user, and have been uploaded
-        files_to_merge = []
-        total_pages = 0
+            raise InvalidFileInputError("At least 2 files are required for merging")
         
-        for file_id in input_data.file_ids:
-            file_entity = await self.get_file(file_id, owner_external_id)
-            
+        # One batched query fetches every input with the ownership filter
+        # applied, instead of N per-file SELECTs
+        found = await self.file_repo.get_files_by_ids(input_data.file_ids, owner_external_id)
+        by_id = {file_entity.file_id: file_entity for file_entity in found}
+
+        missing = [file_id for file_id in input_data.file_ids if file_id not in by_id]
+        if missing:
+            # An id owned by someone else is reported as not found on purpose:
+            # it avoids leaking which file ids exist
+            raise FileNotFoundError(f"File {missing[0]} not found")
+
+        # Preserve the requested order for the merge itself
+        files_to_merge = [by_id[file_id] for file_id in input_data.file_ids]
+        total_pages = sum(file_entity.amount_of_pages for file_entity in files_to_merge)
+
+        for file_entity in files_to_merge:
             if not file_entity.is_uploaded:
-                raise FileNotUploadedError(f"File {file_id} has not been uploaded yet")
-            
-            # Check if file exists in S3
-            if not await self.storage_service.file_exists(file_id):
-                raise FileNotFoundError(f"File {file_id} not found in storage")
-            
-            files_to_merge.append(file_entity)
-            total_pages += file_entity.amount_of_pages
+                raise FileNotUploadedError(f"File {file_entity.file_id} has not been uploaded yet")
+
+        # No HEAD pre-check: the download itself raises FileNotFoundError on
+        # a missing key, so the extra S3 round-trip per file buys nothing
         
         # Create merged file entry
         merged_name = f"merged_{'_'.join([f.name[:10] for f in files_to_merge[:3]])}"
@@ -142,40 +188,55 @@ class FileService:
         )
         
         merged_file = await self.create_file(create_input, owner_external_id)
-        
-        # Merge PDFs
+
+        # Merge PDFs via temp files: downloads run concurrently and the
+        # merged output is streamed to S3, so memory stays at one file's
+        # worth instead of the sum of all inputs
         try:
-            merger = PdfMerger()
-            
-            # Download files from S3 and merge
-            for file_entity in files_to_merge:
-                # Download file content from S3
-                file_content = await self.storage_service.download_file(file_entity.file_id)
-                if not file_content:
-                    raise FileNotFoundError(f"Could not download file {file_entity.file_id}")
-                
-                # Add to merger using BytesIO
-                merger.append(io.BytesIO(file_content))
-            
-            # Write merged PDF to bytes
-            merged_bytes = io.BytesIO()
-            merger.write(merged_bytes)
-            merger.close()
-            
-            # Upload merged file to S3
-            merged_bytes.seek(0)
-            storage_path = await self.storage_service.upload_file(
-                merged_file.file_id,
-                merged_bytes.read()
-            )
-            
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                input_paths = [
+                    os.path.join(tmp_dir, f"{file_entity.file_id}.pdf")
+                    for file_entity in files_to_merge
+                ]
+
+                async with asyncio.TaskGroup() as tg:
+                    for file_entity, path in zip(files_to_merge, input_paths):
+                        tg.create_task(
+                            self._download_limited(file_entity.file_id, path)
+                        )
+
+                # The merge itself is CPU-bound; keep it off the event loop
+                merged_path = os.path.join(tmp_dir, f"{merged_file.file_id}.pdf")
+                await asyncio.to_thread(_merge_pdfs_sync, input_paths, merged_path)
+
+                # Multipart upload from disk; no second in-memory copy
+                with open(merged_path, "rb") as merged_stream:
+                    storage_path = await self.storage_service.upload_fileobj(
+                        merged_file.file_id,
+                        merged_stream
+                    )
+
             # Update merged file path in database
             await self.file_repo.update_file_path(merged_file.file_id, storage_path)
             merged_file.file_path = storage_path
             merged_file.is_uploaded = True
-            
+
             return merged_file
-            
+
+        except FileNotFoundError:
+            # A missing input surfaced by the download; clean up but keep
+            # the specific error instead of wrapping it as a merge failure
+            await self.file_repo.delete_file(merged_file.file_id)
+            raise
+        except ExceptionGroup as eg:
+            # TaskGroup wraps child failures in an ExceptionGroup; unwrap a
+            # missing-input error so it still reaches the caller as a 404
+            # rather than a generic merge failure
+            await self.file_repo.delete_file(merged_file.file_id)
+            missing = eg.subgroup(FileNotFoundError)
+            if missing is not None:
+                raise missing.exceptions[0] from eg
+            raise FileMergeError(f"Error merging files: {str(eg)}")
         except Exception as e:
             # Clean up created file on error
             await self.file_repo.delete_file(merged_file.file_id)
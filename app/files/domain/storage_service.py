@@ -1,20 +1,40 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, BinaryIO, Optional
 
 
 class IFileStorageService(ABC):
     """Interface for file storage operations"""
-    
+
     @abstractmethod
     async def upload_file(self, file_id: str, content: bytes) -> str:
         """Upload file content and return the storage path/key"""
         pass
-    
+
+    @abstractmethod
+    async def upload_fileobj(self, file_id: str, stream: BinaryIO) -> str:
+        """Upload file content from a stream and return the storage path/key"""
+        pass
+
     @abstractmethod
     async def download_file(self, file_id: str) -> Optional[bytes]:
         """Download file content"""
         pass
+
+    @abstractmethod
+    def stream_download(self, file_id: str) -> AsyncIterator[bytes]:
+        """Stream file content in chunks without buffering the whole object"""
+        pass
+
+    @abstractmethod
+    async def download_to_file(self, file_id: str, path: str) -> None:
+        """Download file content to a local path without buffering it in memory"""
+        pass
     
+    @abstractmethod
+    async def get_presigned_url(self, file_id: str, expires_in: int = 300) -> str:
+        """Return a time-limited URL for downloading the file directly from storage"""
+        pass
+
     @abstractmethod
     async def delete_file(self, file_id: str) -> bool:
         """Delete file from storage"""
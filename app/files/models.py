@@ -9,6 +9,7 @@ class File(Model):
     description = fields.TextField(null=True)
     amount_of_pages = fields.IntField()
     file_path = fields.CharField(max_length=500, null=True)
+    sha256 = fields.CharField(max_length=64, null=True)  # content digest for dedupe
     owner = fields.ForeignKeyField("authentication.User", related_name="files")
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
@@ -16,6 +17,9 @@ class File(Model):
     
     class Meta:
         table = "files"
+        # Ownership-scoped lookups (file_id IN (...) AND owner_id = ...)
+        # resolve with a single index scan
+        indexes = (("owner_id", "file_id"), ("owner_id", "sha256"))
     
     def to_dict(self):
         """Convert file to dictionary for API responses"""
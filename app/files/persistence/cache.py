@@ -0,0 +1,78 @@
+import orjson
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Optional
+
+from app.redis import redis_client
+from app.files.domain.entities import FileEntity
+
+# TTL for cached file entries; writes invalidate explicitly, the TTL only
+# bounds staleness if an invalidation is ever missed
+FILE_CACHE_TTL = 600
+
+
+def _file_key(file_id: str) -> str:
+    return f"v1:file:{file_id}"
+
+
+def _owner_key(owner_external_id: int) -> str:
+    return f"v1:owner:{owner_external_id}:files"
+
+
+def _encode(entity: FileEntity) -> bytes:
+    return orjson.dumps(asdict(entity))
+
+
+def _decode(raw: bytes) -> FileEntity:
+    data = orjson.loads(raw)
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    data["updated_at"] = datetime.fromisoformat(data["updated_at"])
+    return FileEntity(**data)
+
+
+class FileCache:
+    """Cache-aside store for FileEntity lookups backed by the shared Redis"""
+
+    def __init__(self, client=redis_client):
+        self._redis = client
+
+    async def get_file(self, file_id: str) -> Optional[FileEntity]:
+        raw = await self._redis.get(_file_key(file_id))
+        return _decode(raw) if raw else None
+
+    async def set_file(self, entity: FileEntity) -> None:
+        await self._redis.set(_file_key(entity.file_id), _encode(entity), ex=FILE_CACHE_TTL)
+
+    async def invalidate_file(self, file_id: str) -> None:
+        await self._redis.delete(_file_key(file_id))
+
+    async def get_owner_files(self, owner_external_id: int) -> Optional[List[FileEntity]]:
+        """Return the owner's files, or None when not fully cached"""
+        raw_ids = await self._redis.get(_owner_key(owner_external_id))
+        if raw_ids is None:
+            return None
+
+        file_ids = orjson.loads(raw_ids)
+        if not file_ids:
+            return []
+
+        raws = await self._redis.mget([_file_key(file_id) for file_id in file_ids])
+        if any(raw is None for raw in raws):
+            # A member entry expired or was invalidated: treat as a miss
+            return None
+
+        return [_decode(raw) for raw in raws]
+
+    async def set_owner_files(self, owner_external_id: int, entities: List[FileEntity]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        for entity in entities:
+            pipe.set(_file_key(entity.file_id), _encode(entity), ex=FILE_CACHE_TTL)
+        pipe.set(
+            _owner_key(owner_external_id),
+            orjson.dumps([entity.file_id for entity in entities]),
+            ex=FILE_CACHE_TTL,
+        )
+        await pipe.execute()
+
+    async def invalidate_owner(self, owner_external_id: int) -> None:
+        await self._redis.delete(_owner_key(owner_external_id))
@@ -2,19 +2,24 @@ from typing import Optional, List
 
 from app.files.models import File
 from app.files.domain.entities import FileEntity
+from app.files.domain.exceptions import InvalidFileInputError
 from app.files.domain.service import IFileRepository
+from app.files.persistence.cache import FileCache
 from app.authentication.models import User
 
 
 class FileRepository(IFileRepository):
     """Tortoise ORM implementation of file repository"""
-    
+
+    def __init__(self, cache: Optional[FileCache] = None):
+        self._cache = cache or FileCache()
+
     async def create_file(self, file_data: dict) -> FileEntity:
         """Create a new file"""
         # Get user by external_id
         user = await User.filter(external_id=file_data["owner_external_id"]).first()
         if not user:
-            raise ValueError(f"User with external_id {file_data['owner_external_id']} not found")
+            raise InvalidFileInputError(f"User with external_id {file_data['owner_external_id']} not found")
         
         file = await File.create(
             file_id=file_data["file_id"],
@@ -23,7 +28,10 @@ class FileRepository(IFileRepository):
             description=file_data.get("description"),
             owner_id=user.id
         )
-        
+
+        # The cached owner listing no longer includes this file
+        await self._cache.invalidate_owner(user.external_id)
+
         return FileEntity(
             id=file.id,
             file_id=file.file_id,
@@ -38,15 +46,17 @@ class FileRepository(IFileRepository):
         )
     
     async def get_file_by_id(self, file_id: str) -> Optional[FileEntity]:
-        """Get file by ID"""
-        file = await File.filter(file_id=file_id).first()
+        """Get file by ID (cache-aside: Redis first, database on miss)"""
+        cached = await self._cache.get_file(file_id)
+        if cached:
+            return cached
+
+        # select_related joins the owner in, avoiding a second query
+        file = await File.filter(file_id=file_id).select_related("owner").first()
         if not file:
             return None
-        
-        # Get owner
-        owner = await file.owner
-        
-        return FileEntity(
+
+        entity = FileEntity(
             id=file.id,
             file_id=file.file_id,
             name=file.name,
@@ -54,20 +64,39 @@ class FileRepository(IFileRepository):
             description=file.description,
             file_path=file.file_path,
             is_uploaded=file.is_uploaded,
-            owner_external_id=owner.external_id,
+            owner_external_id=file.owner.external_id,
             created_at=file.created_at,
             updated_at=file.updated_at
         )
-    
+        await self._cache.set_file(entity)
+        return entity
+
     async def get_files_by_owner(self, owner_external_id: int) -> List[FileEntity]:
-        """Get all files owned by user"""
-        # Get user by external_id
-        user = await User.filter(external_id=owner_external_id).first()
-        if not user:
-            return []
-        
-        files = await File.filter(owner_id=user.id).all()
-        
+        """Get all files owned by user (cache-aside: Redis first, database on miss)"""
+        cached = await self._cache.get_owner_files(owner_external_id)
+        if cached is not None:
+            return cached
+
+        # .values(...) skips ORM hydration entirely on the list path.
+        # file_path stays in the projection because the per-file cache
+        # entries are shared with get_file_by_id, which needs it.
+        rows = await File.filter(owner__external_id=owner_external_id).values(
+            "id", "file_id", "name", "amount_of_pages", "description",
+            "file_path", "is_uploaded", "created_at", "updated_at",
+            "owner__external_id"
+        )
+
+        entities = [FileEntity.from_values_row(row) for row in rows]
+        await self._cache.set_owner_files(owner_external_id, entities)
+        return entities
+
+    async def get_files_by_ids(self, file_ids: List[str], owner_external_id: int) -> List[FileEntity]:
+        """Get the given files in one query, filtered by owner"""
+        files = await File.filter(
+            file_id__in=file_ids,
+            owner__external_id=owner_external_id
+        ).all()
+
         return [
             FileEntity(
                 id=file.id,
@@ -83,23 +112,24 @@ class FileRepository(IFileRepository):
             )
             for file in files
         ]
-    
+
     async def update_file_path(self, file_id: str, file_path: str) -> bool:
-        """Update file path"""
-        file = await File.filter(file_id=file_id).first()
-        if not file:
+        """Update file path in a single UPDATE; the row count says whether it existed"""
+        updated = await File.filter(file_id=file_id).update(
+            file_path=file_path,
+            is_uploaded=True
+        )
+        if not updated:
             return False
-        
-        file.file_path = file_path
-        file.is_uploaded = True
-        await file.save()
+
+        await self._cache.invalidate_file(file_id)
         return True
-    
+
     async def delete_file(self, file_id: str) -> bool:
-        """Delete file"""
-        file = await File.filter(file_id=file_id).first()
-        if not file:
+        """Delete file in a single DELETE; the row count says whether it existed"""
+        deleted = await File.filter(file_id=file_id).delete()
+        if not deleted:
             return False
-        
-        await file.delete()
+
+        await self._cache.invalidate_file(file_id)
         return True
\ No newline at end of file
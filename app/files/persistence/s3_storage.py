@@ -1,9 +1,12 @@
+import asyncio
 import os
 import boto3
-from typing import Optional
+from typing import AsyncIterator, BinaryIO, Optional
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from app.files.domain.storage_service import IFileStorageService
+from app.files.domain.exceptions import FileNotFoundError
 
 
 class S3StorageService(IFileStorageService):
@@ -11,36 +14,64 @@ class S3StorageService(IFileStorageService):
     
     def __init__(self):
         self._s3_client = None
+        self._client_lock = asyncio.Lock()
         self._bucket_name = os.getenv("S3_BUCKET_NAME", "carlemany-files")
         self._endpoint_url = os.getenv("AWS_ENDPOINT_URL")  # For LocalStack
         self._region = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
-    
+
     async def _get_s3_client(self):
-        """Get S3 client (lazy initialization)"""
+        """Get S3 client (lazy initialization, guarded against cold-start races)"""
         if self._s3_client is None:
-            self._s3_client = boto3.client(
-                's3',
-                endpoint_url=self._endpoint_url,
-                region_name=self._region,
-                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
-                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test")
-            )
-            
-            # Create bucket if it doesn't exist (for LocalStack)
+            async with self._client_lock:
+                if self._s3_client is None:
+                    self._s3_client = await asyncio.to_thread(self._build_client)
+        return self._s3_client
+
+    def _build_client(self):
+        """Create the boto3 client (blocking)"""
+        # A pool sized for concurrent request handling plus keep-alive, so
+        # parallel uploads/downloads reuse TLS connections instead of
+        # stalling on the default pool of 10 and re-handshaking
+        config = Config(
+            max_pool_connections=50,
+            tcp_keepalive=True,
+            retries={'max_attempts': 3, 'mode': 'adaptive'},
+            signature_version='s3v4'
+        )
+
+        return boto3.client(
+            's3',
+            endpoint_url=self._endpoint_url,
+            region_name=self._region,
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "test"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "test"),
+            config=config
+        )
+
+    async def ensure_bucket(self) -> None:
+        """Create the bucket if it doesn't exist (for LocalStack)
+
+        Called once at app startup so the bootstrap never runs inside a
+        user request.
+        """
+        s3_client = await self._get_s3_client()
+
+        def _bootstrap():
             try:
-                self._s3_client.head_bucket(Bucket=self._bucket_name)
+                s3_client.head_bucket(Bucket=self._bucket_name)
             except ClientError:
-                self._s3_client.create_bucket(Bucket=self._bucket_name)
-        
-        return self._s3_client
-    
+                s3_client.create_bucket(Bucket=self._bucket_name)
+
+        await asyncio.to_thread(_bootstrap)
+
     async def upload_file(self, file_id: str, content: bytes) -> str:
         """Upload file content to S3"""
         s3_client = await self._get_s3_client()
         key = f"files/{file_id}.pdf"
-        
+
         try:
-            s3_client.put_object(
+            await asyncio.to_thread(
+                s3_client.put_object,
                 Bucket=self._bucket_name,
                 Key=key,
                 Body=content,
@@ -50,29 +81,102 @@ class S3StorageService(IFileStorageService):
         except Exception as e:
             raise Exception(f"Failed to upload file to S3: {str(e)}")
     
-    async def download_file(self, file_id: str) -> Optional[bytes]:
-        """Download file content from S3"""
+    async def upload_fileobj(self, file_id: str, stream: BinaryIO) -> str:
+        """Upload file content to S3 from a stream (multipart, ~8 MB chunks)"""
         s3_client = await self._get_s3_client()
         key = f"files/{file_id}.pdf"
-        
+
         try:
-            response = s3_client.get_object(
+            await asyncio.to_thread(
+                s3_client.upload_fileobj,
+                stream,
+                self._bucket_name,
+                key,
+                ExtraArgs={'ContentType': 'application/pdf'}
+            )
+            return key
+        except Exception as e:
+            raise Exception(f"Failed to upload file to S3: {str(e)}")
+
+    async def download_to_file(self, file_id: str, path: str) -> None:
+        """Download an S3 object straight to a local file, off the event loop"""
+        s3_client = await self._get_s3_client()
+        key = f"files/{file_id}.pdf"
+
+        def _download():
+            with open(path, "wb") as fh:
+                s3_client.download_fileobj(self._bucket_name, key, fh)
+
+        try:
+            await asyncio.to_thread(_download)
+        except ClientError as e:
+            # Let a missing key surface as the domain error instead of
+            # requiring callers to HEAD the object first
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                raise FileNotFoundError(f"File {file_id} not found in storage")
+            raise Exception(f"Failed to download file from S3: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Failed to download file from S3: {str(e)}")
+
+    async def stream_download(self, file_id: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """Stream an object's bytes in chunks, capping memory at one chunk"""
+        s3_client = await self._get_s3_client()
+        key = f"files/{file_id}.pdf"
+
+        try:
+            response = await asyncio.to_thread(
+                s3_client.get_object,
                 Bucket=self._bucket_name,
                 Key=key
             )
-            return response['Body'].read()
         except ClientError as e:
-            if e.response['Error']['Code'] == 'NoSuchKey':
-                return None
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                raise FileNotFoundError(f"File {file_id} not found in storage")
             raise Exception(f"Failed to download file from S3: {str(e)}")
+
+        body = response['Body']
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def download_file(self, file_id: str) -> Optional[bytes]:
+        """Download file content from S3 (convenience wrapper over stream_download)"""
+        chunks = []
+        try:
+            async for chunk in self.stream_download(file_id):
+                chunks.append(chunk)
+        except FileNotFoundError:
+            return None
+        return b"".join(chunks)
     
+    async def get_presigned_url(self, file_id: str, expires_in: int = 300) -> str:
+        """Generate a time-limited URL so clients download straight from S3"""
+        s3_client = await self._get_s3_client()
+        key = f"files/{file_id}.pdf"
+
+        try:
+            return await asyncio.to_thread(
+                s3_client.generate_presigned_url,
+                'get_object',
+                Params={'Bucket': self._bucket_name, 'Key': key},
+                ExpiresIn=expires_in
+            )
+        except Exception as e:
+            raise Exception(f"Failed to generate presigned URL: {str(e)}")
+
     async def delete_file(self, file_id: str) -> bool:
         """Delete file from S3"""
         s3_client = await self._get_s3_client()
         key = f"files/{file_id}.pdf"
         
         try:
-            s3_client.delete_object(
+            await asyncio.to_thread(
+                s3_client.delete_object,
                 Bucket=self._bucket_name,
                 Key=key
             )
@@ -86,7 +190,8 @@ class S3StorageService(IFileStorageService):
         key = f"files/{file_id}.pdf"
         
         try:
-            s3_client.head_object(
+            await asyncio.to_thread(
+                s3_client.head_object,
                 Bucket=self._bucket_name,
                 Key=key
             )
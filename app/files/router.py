@@ -1,76 +1,124 @@
-from fastapi import APIRouter, Header, Body, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, Header, Body, UploadFile, File, HTTPException, Response
 from typing import Union
-import httpx
+import aiofiles
+import aiofiles.os
+import asyncio
+import hashlib
+import tempfile
+import msgspec
 from pydantic import BaseModel
 from typing import Optional
-import uuid
-from pypdf import PdfMerger
+from uuid_utils import uuid7
+from cachetools import TTLCache
+from pypdf import PdfReader, PdfWriter
 import os
+import pathlib
+from tortoise.transactions import in_transaction
+from app.executors import merge_pool
 from app.files.models import File as FileModel
-from app.authentication.models import User
+from app.authentication.dependency_injection.container import auth_service
+from app.authentication.domain import InvalidSessionError
+from app.authentication.domain.entities import UserEntity
 
 router = APIRouter()
 
+# Upload copy granularity: syscall cost is nearly flat between 8 KiB and
+# 1 MiB, so bigger chunks mean proportionally fewer loop iterations
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1 << 20)))
+
+# Created once at import; saves the stat+mkdir syscall every upload and
+# merge used to pay via os.makedirs
+FILES_DIR = pathlib.Path("files")
+FILES_DIR.mkdir(exist_ok=True)
+
 class CarlemanyFile(BaseModel):
     name: str
     amount_of_pages: int
     path: Optional[str] = None
 
 
-class Person(BaseModel):
-    username: str
-    mail: str
+class FileOut(msgspec.Struct):
+    """Listing row; msgspec.Struct encodes straight to bytes in C"""
+    file_id: str
+    name: str
+    pages: int
+    uploaded: bool
+
+def _merge_pdfs(first_path: str, second_path: str, merged_path: str) -> None:
+    """Concatenate two PDFs (CPU-bound; callers run it off the event loop)
+
+    PdfWriter with lazily-parsed readers avoids PdfMerger's habit of pulling
+    every stream into memory up front.
+    """
+    writer = PdfWriter()
+    try:
+        for path in (first_path, second_path):
+            writer.append(PdfReader(path, strict=False), import_outline=False)
+        # 1 MiB buffering turns pypdf's many small writes into few large
+        # write(2) calls; fsync makes the file durable before the DB row
+        # pointing at it is created
+        with open(merged_path, "wb", buffering=1 << 20) as out:
+            writer.write(out)
+            out.flush()
+            os.fsync(out.fileno())
+    finally:
+        writer.close()
+
+async def _path_missing(path: Optional[str]) -> bool:
+    """True if path is unset or doesn't exist; stat runs off the event loop"""
+    if not path:
+        return True
+    try:
+        await aiofiles.os.stat(path)
+    except FileNotFoundError:
+        return True
+    return False
+
+# Hot tokens resolve to a dict lookup instead of a DB join. The 30s TTL
+# bounds staleness; logout evicts eagerly. Uvicorn handlers run on one
+# event-loop thread, so no extra locking is needed around the cache.
+_introspect_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+def invalidate_introspect_cache(token: str) -> None:
+    """Evict a token's cached user (called from logout)"""
+    _introspect_cache.pop(token, None)
 
-class FileObjectDatabase(BaseModel):
-    id: str
-    owner: Person
-    file: CarlemanyFile
+async def introspect(auth: str = Header(alias="auth")) -> UserEntity:
+    user = _introspect_cache.get(auth)
+    if user is not None:
+        return user
 
-async def introspect(auth: str) -> Person:
-    from app.authentication.models import Session
-    session = await Session.filter(token=auth, is_active=True).first()
-    if not session:
+    # Tokens are minted by the Redis-backed auth service on /login, so they
+    # must be resolved there too; the old Postgres sessions join read a
+    # table nothing writes anymore
+    try:
+        user = await auth_service.introspect(auth)
+    except InvalidSessionError:
         raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    user = await session.user
-    return Person(username=user.username, mail=user.email)
+
+    _introspect_cache[auth] = user
+    return user
 
 @router.get("")
-async def files_get(auth: str = Header(alias="auth")) -> dict[str, Union[str, list]]:
-    introspect_response = await introspect(auth=auth)
-    
-    # Get user from database
-    user = await User.filter(username=introspect_response.username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    # Get all files owned by the user
-    files = await FileModel.filter(owner_id=user.id).all()
-    user_files = []
-    for file_obj in files:
-        user_files.append({
-            "file_id": file_obj.file_id,
-            "name": file_obj.name,
-            "pages": file_obj.amount_of_pages,
-            "uploaded": file_obj.is_uploaded
-        })
-    
-    return {
+async def files_get(user: UserEntity = Depends(introspect)) -> Response:
+    # Tuple rows from the driver, wrapped in msgspec structs and encoded
+    # to bytes in C: the listing never builds per-row dicts in Python
+    rows = await FileModel.filter(owner_id=user.id).values_list(
+        "file_id", "name", "amount_of_pages", "is_uploaded"
+    )
+
+    payload = msgspec.json.encode({
         "status": "ok",
-        "files": user_files
-    }
+        "files": [FileOut(*row) for row in rows]
+    })
+    return Response(content=payload, media_type="application/json")
 
 
 @router.post("")
-async def files_post(auth: str = Header(alias="auth"), input_body: CarlemanyFile = Body()) -> dict[str, str]:
-    file_id = str(uuid.uuid4())
-    introspect_response = await introspect(auth=auth)
-    
-    # Get user from database
-    user = await User.filter(username=introspect_response.username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
+async def files_post(user: UserEntity = Depends(introspect), input_body: CarlemanyFile = Body()) -> dict[str, str]:
+    # Time-ordered ids append to the rightmost B-tree leaf instead of
+    # scattering inserts across the index like uuid4; hex keeps them short
+    file_id = uuid7().hex
     # Create file in database
     file_obj = await FileModel.create(
         file_id=file_id,
@@ -88,75 +136,78 @@ class MergeContentInput(BaseModel):
     second_id : str
 
 @router.post("/merge")
-async def files_merge(auth: str = Header(alias="auth"), input_body: MergeContentInput = Body()) -> dict[str, str]:
-    # Authenticate user
-    introspect_response = await introspect(auth=auth)
-    user = await User.filter(username=introspect_response.username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    # Check if both files exist in database
-    first_file = await FileModel.filter(file_id=input_body.first_id, owner_id=user.id).first()
+async def files_merge(user: UserEntity = Depends(introspect), input_body: MergeContentInput = Body()) -> dict[str, str]:
+    # Check if both files exist in database (one IN-query instead of two);
+    # plain dict rows, since nothing here needs an ORM instance
+    rows = await FileModel.filter(
+        file_id__in=[input_body.first_id, input_body.second_id],
+        owner_id=user.id
+    ).values("file_id", "file_path", "name", "amount_of_pages")
+    by_id = {row["file_id"]: row for row in rows}
+
+    first_file = by_id.get(input_body.first_id)
     if not first_file:
         raise HTTPException(status_code=404, detail=f"First file {input_body.first_id} not found")
-    
-    second_file = await FileModel.filter(file_id=input_body.second_id, owner_id=user.id).first()
+
+    second_file = by_id.get(input_body.second_id)
     if not second_file:
         raise HTTPException(status_code=404, detail=f"Second file {input_body.second_id} not found")
     
     # Check if files have been uploaded
-    if not first_file.file_path or not os.path.exists(first_file.file_path):
+    if await _path_missing(first_file["file_path"]):
         raise HTTPException(status_code=400, detail=f"File {input_body.first_id} has not been uploaded yet")
-    if not second_file.file_path or not os.path.exists(second_file.file_path):
+    if await _path_missing(second_file["file_path"]):
         raise HTTPException(status_code=400, detail=f"File {input_body.second_id} has not been uploaded yet")
     
-    # Merge the PDFs
-    merger = PdfMerger()
+    # Merge the PDFs in the process pool: CPU-bound work leaves this
+    # worker's GIL entirely, so parallel merges use multiple cores
+    merged_id = uuid7().hex
+    merged_path = str(FILES_DIR / f"{merged_id}.pdf")
     try:
-        merger.append(first_file.file_path)
-        merger.append(second_file.file_path)
-        
-        # Create new file entry for merged PDF
-        merged_id = str(uuid.uuid4())
-        merged_path = f"files/{merged_id}.pdf"
-        merger.write(merged_path)
-        merger.close()
-        
-        # Calculate total pages
-        total_pages = first_file.amount_of_pages + second_file.amount_of_pages
-        
-        # Create database entry for merged file
-        merged_file = await FileModel.create(
-            file_id=merged_id,
-            name=f"merged_{first_file.name}_{second_file.name}",
-            amount_of_pages=total_pages,
-            file_path=merged_path,
-            is_uploaded=True,
-            owner_id=user.id
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            merge_pool, _merge_pdfs, first_file["file_path"], second_file["file_path"], merged_path
         )
-        
+
+        # Calculate total pages
+        total_pages = first_file["amount_of_pages"] + second_file["amount_of_pages"]
+
+        # Create database entry for merged file inside one explicit commit
+        # boundary; if the insert fails nothing half-written stays behind
+        async with in_transaction() as conn:
+            await FileModel.create(
+                file_id=merged_id,
+                name=f"merged_{first_file['name']}_{second_file['name']}",
+                amount_of_pages=total_pages,
+                file_path=merged_path,
+                is_uploaded=True,
+                owner_id=user.id,
+                using_db=conn
+            )
+
         return {
             "status": "ok",
             "message": "Files merged successfully",
             "merged_file_id": merged_id
         }
     except Exception as e:
+        # The transaction rolled back the row; drop the orphan file too
+        try:
+            await aiofiles.os.remove(merged_path)
+        except FileNotFoundError:
+            pass
         raise HTTPException(status_code=500, detail=f"Error merging files: {str(e)}")
 
 
 @router.get("/{id}")
-async def files_id_get(id: str, auth: str = Header(alias="auth")) -> dict[str, Union[str, int]]:
-    # Authenticate user
-    introspect_response = await introspect(auth=auth)
-    user = await User.filter(username=introspect_response.username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
+async def files_id_get(id: str, user: UserEntity = Depends(introspect)) -> dict[str, Union[str, int]]:
     # Check if file exists and user owns it
-    current_file = await FileModel.filter(file_id=id, owner_id=user.id).first()
+    current_file = await FileModel.filter(file_id=id, owner_id=user.id).only(
+        "id", "name", "amount_of_pages", "is_uploaded"
+    ).first()
     if not current_file:
         raise HTTPException(status_code=404, detail="File not found")
-    
+
     return {
         "status": "ok",
         "file_id": id,
@@ -166,12 +217,7 @@ async def files_id_get(id: str, auth: str = Header(alias="auth")) -> dict[str, U
     }    
 
 @router.post("/{id}")
-async def files_id_post(id: str, file_content: UploadFile = File(), auth: str = Header(alias="auth")) -> dict[str, str]:
-    introspect_response = await introspect(auth=auth)
-    user = await User.filter(username=introspect_response.username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
+async def files_id_post(id: str, file_content: UploadFile = File(), user: UserEntity = Depends(introspect)) -> dict[str, str]:
     # Check if file exists and user owns it
     current_file = await FileModel.filter(file_id=id, owner_id=user.id).first()
     if not current_file:
@@ -184,42 +230,109 @@ async def files_id_post(id: str, file_content: UploadFile = File(), auth: str =
             detail=f"Invalid file type: {file_content.content_type}. Only PDFs are allowed."
         )
     
-    # Save file
-    filename = id + ".pdf"
-    prefix = "files/"
-    os.makedirs(prefix, exist_ok=True)
-    filepath = prefix + filename
-    
-    with open(filepath, "wb") as buffer:
-        while chunk := await file_content.read(8192):
-            buffer.write(chunk)
-    
+    # Save file (FILES_DIR already exists; created at module import)
+    filepath = str(FILES_DIR / f"{id}.pdf")
+
+    # Earlier pointer-style dedupes could leave sibling rows referencing
+    # this path directly; give each its own hardlink to the current bytes
+    # before the re-upload replaces them
+    sharers = await FileModel.filter(file_path=filepath).exclude(id=current_file.id).only("id", "file_id")
+    for sharer in sharers:
+        own_path = str(FILES_DIR / f"{sharer.file_id}.pdf")
+        try:
+            await aiofiles.os.link(filepath, own_path)
+        except (FileNotFoundError, FileExistsError):
+            pass
+        await FileModel.filter(id=sharer.id).update(file_path=own_path)
+
+    # Unlink before writing: deduped siblings hold hardlinks to the old
+    # content, and an in-place "wb" rewrite would change their bytes too.
+    # Removing the name first puts the new content on a fresh inode.
+    try:
+        await aiofiles.os.remove(filepath)
+    except FileNotFoundError:
+        pass
+
+    await file_content.seek(0)
+    spool = file_content.file
+    if isinstance(spool, tempfile.SpooledTemporaryFile) and getattr(spool, "_rolled", False):
+        # The upload already spilled to disk: hash it there, then copy
+        # kernel-to-kernel with sendfile, so no chunk ever becomes a
+        # Python bytes object
+        def _sendfile_copy():
+            spool.seek(0)
+            file_digest = hashlib.file_digest(spool, "sha256").hexdigest()
+            size = os.fstat(spool.fileno()).st_size
+            with open(filepath, "wb") as out:
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(out.fileno(), spool.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            return file_digest
+
+        digest = await asyncio.to_thread(_sendfile_copy)
+    else:
+        # Async writes keep the event loop free during uploads; chunk size
+        # is tunable via UPLOAD_CHUNK_SIZE (default 1 MiB, ~128x fewer
+        # syscalls than the old 8 KiB loop). The digest rides along on the
+        # chunks already in hand, so hashing adds no extra I/O.
+        hasher = hashlib.sha256()
+        async with aiofiles.open(filepath, "wb", buffering=UPLOAD_CHUNK_SIZE) as buffer:
+            while chunk := await file_content.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                await buffer.write(chunk)
+        digest = hasher.hexdigest()
+
+    # Dedupe: if this user already has identical content on disk, hardlink
+    # this row's own path to that inode and drop the copy just written.
+    # Every row keeps its own files/{id}.pdf name, so a later re-upload of
+    # either file rewrites only its own name and never another row's bytes.
+    duplicate = await FileModel.filter(
+        owner_id=user.id, sha256=digest, is_uploaded=True
+    ).exclude(id=current_file.id).only("id", "file_path").first()
+    if (
+        duplicate
+        and duplicate.file_path
+        and duplicate.file_path != filepath
+        and not await _path_missing(duplicate.file_path)
+    ):
+        await aiofiles.os.remove(filepath)
+        await aiofiles.os.link(duplicate.file_path, filepath)
+
     # Update file in database
     current_file.file_path = filepath
     current_file.is_uploaded = True
+    current_file.sha256 = digest
     await current_file.save()
-    
+
     return {
         "status": "ok"
     }
 
 @router.delete("/{id}")
-async def files_id_delete(id: str, auth: str = Header(alias="auth")) -> dict[str, Union[str, int]]:
-    # Authenticate user
-    introspect_response = await introspect(auth=auth)
-    user = await User.filter(username=introspect_response.username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    # Check if file exists and user owns it
-    current_file = await FileModel.filter(file_id=id, owner_id=user.id).first()
+async def files_id_delete(id: str, user: UserEntity = Depends(introspect)) -> dict[str, Union[str, int]]:
+    # Check if file exists and user owns it (only the columns delete needs)
+    current_file = await FileModel.filter(file_id=id, owner_id=user.id).only(
+        "id", "file_path"
+    ).first()
     if not current_file:
         raise HTTPException(status_code=404, detail="File not found")
-    
-    # Delete physical file if it exists
-    if current_file.file_path and os.path.exists(current_file.file_path):
+
+    # Delete physical file if it exists; try/except on the remove itself
+    # avoids the exists-then-remove race and the extra stat. Deduped rows
+    # hold their own hardlinks, so removing this row's name leaves their
+    # bytes intact; the shared check only guards legacy rows that still
+    # reference the same path string.
+    shared = current_file.file_path and await FileModel.filter(
+        file_path=current_file.file_path
+    ).exclude(id=current_file.id).exists()
+    if current_file.file_path and not shared:
         try:
-            os.remove(current_file.file_path)
+            await aiofiles.os.remove(current_file.file_path)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error deleting file: {str(e)}")
     
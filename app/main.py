@@ -1,17 +1,64 @@
 from fastapi import FastAPI
-from app.authentication.router import router as router_auth
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from app.authentication.api.router import router as router_auth
 from app.files.router import router as router_files
 from app.database import init_db, close_db
+from app.redis import redis_client, warm_redis, close_redis
+from app.executors import shutdown_executors
+from app.files.dependency_injection.container import storage_service
+from app.files.domain import (
+    FileNotFoundError,
+    InvalidFileInputError,
+    FileNotUploadedError,
+    UnauthorizedFileAccessError,
+    FileMergeError,
+)
 
-app = FastAPI()
+# orjson's C-backed encoder replaces stdlib json for every response the
+# app serializes, which matters most for list-heavy payloads
+app = FastAPI(default_response_class=ORJSONResponse)
+
+
+# Domain exceptions map to HTTP responses once, here, instead of being
+# re-translated by try/except blocks in every endpoint.
+@app.exception_handler(FileNotFoundError)
+async def file_not_found_handler(request, exc):
+    return ORJSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+@app.exception_handler(UnauthorizedFileAccessError)
+async def unauthorized_file_access_handler(request, exc):
+    return ORJSONResponse(status_code=401, content={"detail": str(exc)})
+
+
+@app.exception_handler(FileNotUploadedError)
+async def file_not_uploaded_handler(request, exc):
+    return ORJSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidFileInputError)
+async def invalid_file_input_handler(request, exc):
+    return ORJSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+@app.exception_handler(FileMergeError)
+async def file_merge_error_handler(request, exc):
+    return ORJSONResponse(status_code=500, content={"detail": str(exc)})
 
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    await warm_redis()
+    await storage_service.ensure_bucket()
+    FastAPICache.init(RedisBackend(redis_client), prefix="auth-cache")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     await close_db()
+    await close_redis()
+    shutdown_executors()
 
 @app.get("/healthcheck")
 async def healthcheck() -> dict[str, str]: